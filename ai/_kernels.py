@@ -0,0 +1,214 @@
+"""
+網格搜尋融合核心 (Numba)
+將「指標 → 訊號 → 持倉狀態機 → 績效指標」合併為單一編譯迴圈，
+中間的持倉 / 現金 / 總值序列不會寫回記憶體，並以 prange 平行處理各參數組合
+"""
+import math
+from typing import List, Optional
+
+import numpy as np
+
+from utils._njit import njit, prange, NUMBA_AVAILABLE
+from utils.indicators import _rsi_numba
+from strategies.base_strategy import BaseStrategy
+from strategies.momentum import MomentumStrategy
+from strategies.mean_reversion import MeanReversionStrategy
+
+
+# 輸出欄位順序 (與 backtest.evaluation.calculate_metrics 的同名指標一致)
+METRIC_NAMES = ('final_value', 'total_return', 'max_drawdown', 'cagr', 'sharpe_ratio', 'volatility')
+
+# 本行程是否執行過 prange 平行核心 (numba 執行緒池啟動後不可再 fork)
+_prange_started = False
+
+
+@njit(cache=True)
+def _trade_metrics(close, signal, capital, commission):
+    """
+    執行全進全出狀態機並以串流方式計算績效指標
+
+    Returns:
+        (final_value, total_return, max_drawdown, cagr, sharpe_ratio, volatility)
+    """
+    n = len(close)
+    cash = capital
+    position = 0
+
+    prev_total = capital
+    peak = capital
+    max_dd = 0.0
+
+    # Welford 演算法累積報酬率的平均與變異數
+    count = 0
+    mean = 0.0
+    m2 = 0.0
+
+    for i in range(1, n):
+        price = close[i]
+
+        if signal[i] > 0 and position == 0:
+            shares_to_buy = int((cash * (1 - commission)) / price)
+            cost = shares_to_buy * price
+            position = shares_to_buy
+            cash -= cost + cost * commission
+        elif signal[i] < 0 and position > 0:
+            revenue = position * price
+            cash += revenue - revenue * commission
+            position = 0
+
+        total = cash + position * price
+
+        if total > peak:
+            peak = total
+        dd = (total - peak) / peak
+        if dd < max_dd:
+            max_dd = dd
+
+        r = (total - prev_total) / prev_total
+        count += 1
+        delta = r - mean
+        mean += delta / count
+        m2 += delta * (r - mean)
+
+        prev_total = total
+
+    final_value = prev_total
+    total_return = (final_value - capital) / capital * 100
+
+    cagr = 0.0
+    years = n / 252
+    if capital > 0 and years > 0 and final_value != capital:
+        if final_value <= 0:
+            cagr = -100.0
+        else:
+            cagr = (math.exp(math.log(final_value / capital) / years) - 1.0) * 100.0
+
+    sharpe = 0.0
+    volatility = np.nan
+    if count > 1:
+        std = math.sqrt(m2 / (count - 1))
+        volatility = std * math.sqrt(252.0) * 100
+        if std != 0:
+            sharpe = math.sqrt(252.0) * ((mean - 0.02 / 252) / std)
+
+    return final_value, total_return, max_dd * 100, cagr, sharpe, volatility
+
+
+@njit(cache=True)
+def _momentum_signal(close, short_window, long_window):
+    """以滑動總和計算雙均線交叉訊號 (與 MomentumStrategy 相同規則)"""
+    n = len(close)
+    signal = np.zeros(n, dtype=np.int8)
+    sum_short = 0.0
+    sum_long = 0.0
+    prev_pos = 0
+
+    for i in range(n):
+        sum_short += close[i]
+        if i >= short_window:
+            sum_short -= close[i - short_window]
+        sum_long += close[i]
+        if i >= long_window:
+            sum_long -= close[i - long_window]
+
+        pos = 0
+        if i >= short_window - 1 and i >= long_window - 1:
+            if sum_short / short_window > sum_long / long_window:
+                pos = 1
+
+        if i >= 1:
+            signal[i] = pos - prev_pos
+        prev_pos = pos
+
+    return signal
+
+
+@njit(parallel=True, cache=True)
+def _momentum_grid(close, short_windows, long_windows, capital, commission):
+    """平行評估所有動量策略參數組合"""
+    m = len(short_windows)
+    out = np.empty((m, 6))
+
+    for k in prange(m):
+        signal = _momentum_signal(close, short_windows[k], long_windows[k])
+        metrics = _trade_metrics(close, signal, capital, commission)
+        for j in range(6):
+            out[k, j] = metrics[j]
+
+    return out
+
+
+@njit(parallel=True, cache=True)
+def _mean_reversion_grid(close, rsi_table, rsi_index, oversold, overbought, capital, commission):
+    """平行評估所有均值回歸策略參數組合 (RSI 依週期預先計算)"""
+    m = len(rsi_index)
+    n = len(close)
+    out = np.empty((m, 6))
+
+    for k in prange(m):
+        rsi = rsi_table[rsi_index[k]]
+        signal = np.zeros(n, dtype=np.int8)
+        for i in range(n):
+            # 與 MeanReversionStrategy 相同，兩者同時成立時以賣出為準
+            if rsi[i] > overbought[k]:
+                signal[i] = -1
+            elif rsi[i] < oversold[k]:
+                signal[i] = 1
+
+        metrics = _trade_metrics(close, signal, capital, commission)
+        for j in range(6):
+            out[k, j] = metrics[j]
+
+    return out
+
+
+def evaluate_grid(strategies: List[BaseStrategy], close: np.ndarray,
+                  capital: float, commission: float) -> Optional[np.ndarray]:
+    """
+    以融合核心評估一組同類型的內建策略
+
+    Args:
+        strategies: 策略實例列表 (必須全部為 MomentumStrategy 或全部為 MeanReversionStrategy)
+        close: 收盤價陣列
+        capital: 初始資金
+        commission: 手續費率
+
+    Returns:
+        形狀為 (策略數, len(METRIC_NAMES)) 的指標陣列；
+        未安裝 numba 或策略不支援時回傳 None，由呼叫端改用一般回測
+    """
+    global _prange_started
+
+    if not NUMBA_AVAILABLE or not strategies:
+        return None
+
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    capital = float(capital)
+    commission = float(commission)
+
+    # 子類別可能覆寫訊號邏輯，因此只接受內建類別本身
+    if all(type(s) is MomentumStrategy for s in strategies):
+        short_windows = np.array([s.params['short_window'] for s in strategies], dtype=np.int64)
+        long_windows = np.array([s.params['long_window'] for s in strategies], dtype=np.int64)
+        _prange_started = True
+        return _momentum_grid(close, short_windows, long_windows, capital, commission)
+
+    if all(type(s) is MeanReversionStrategy for s in strategies):
+        periods = sorted({s.params['rsi_period'] for s in strategies})
+        # 與 MeanReversionStrategy 相同，以 float32 收盤價計算 RSI
+        close32 = close.astype(np.float32)
+        rsi_table = np.vstack([_rsi_numba(close32, period) for period in periods])
+        rsi_index = np.array([periods.index(s.params['rsi_period']) for s in strategies],
+                             dtype=np.int64)
+        oversold = np.array([s.params['rsi_oversold'] for s in strategies], dtype=np.float64)
+        overbought = np.array([s.params['rsi_overbought'] for s in strategies], dtype=np.float64)
+        _prange_started = True
+        return _mean_reversion_grid(close, rsi_table, rsi_index, oversold, overbought,
+                                    capital, commission)
+
+    return None
+
+
+def prange_started() -> bool:
+    """本行程是否已執行過 prange 平行核心 (之後建立子行程需改用 spawn)"""
+    return _prange_started
@@ -2,13 +2,159 @@
 AI 策略優化工具
 使用 GPT 自動調整策略參數
 """
+import heapq
 import json
-from typing import Dict, Any, List
+import math
+import multiprocessing
+import os
+import pickle
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, List, Optional
 from strategies.base_strategy import BaseStrategy
 from backtest.backtester import Backtester
+from ai._kernels import evaluate_grid, prange_started, METRIC_NAMES
+from utils.json_io import dump_json
+import numpy as np
 import pandas as pd
 
 
+# 子行程共用的回測資料 (由 initializer 設定一次，避免每個任務重複序列化 DataFrame)
+_worker_data = None
+_worker_capital = None
+
+
+def _backtest_strategy(strategy: BaseStrategy, data: pd.DataFrame,
+                       initial_capital: float) -> Dict[str, Any]:
+    """執行單一策略回測並整理成結果字典"""
+    backtester = Backtester(initial_capital=initial_capital)
+    backtester.run(strategy, data)
+    metrics = backtester.summary()
+
+    return {
+        'strategy_name': strategy.name,
+        'parameters': strategy.get_params(),
+        'metrics': metrics
+    }
+
+
+def _init_worker(data: pd.DataFrame, initial_capital: float):
+    """子行程初始化：保存回測資料"""
+    global _worker_data, _worker_capital
+    _worker_data = data
+    _worker_capital = initial_capital
+
+
+def _evaluate_combination(task) -> Dict[str, Any]:
+    """子行程任務：以指定參數建立策略並回測"""
+    strategy_class, params = task
+    return _backtest_strategy(strategy_class(**params), _worker_data, _worker_capital)
+
+
+def _spawn_can_load(strategy_class) -> bool:
+    """spawn 子行程能否載入策略類別 (REPL、stdin 或 Jupyter 的 __main__ 無法重新匯入)"""
+    if strategy_class.__module__ != '__main__':
+        return True
+    main_file = getattr(sys.modules['__main__'], '__file__', None)
+    return main_file is not None and os.path.isfile(main_file)
+
+
+def _parallel_results(tasks, data: pd.DataFrame, initial_capital: float, n_jobs: int):
+    """
+    以多行程評估參數組合，依完成順序產生 (序號, 結果)
+
+    spawn 子行程載入不到策略類別、策略無法序列化或行程池中斷時，
+    改為在本行程逐一回測尚未完成的組合
+    """
+    # 融合核心執行過 prange 後 numba 的執行緒池已啟動，fork 出的子行程會讓直譯器結束時卡住，
+    # 此時才改用 spawn；其餘情況沿用平台預設，__main__ 中定義的策略類別仍可傳給子行程
+    mp_context = None
+    if prange_started():
+        if not _spawn_can_load(tasks[0][0]):
+            print("提示: 策略類別定義於互動環境，改為逐一回測")
+            for i, (cls, params) in enumerate(tasks):
+                yield i, _backtest_strategy(cls(**params), data, initial_capital)
+            return
+        mp_context = multiprocessing.get_context('spawn')
+
+    done = set()
+    try:
+        with ProcessPoolExecutor(max_workers=n_jobs, mp_context=mp_context,
+                                 initializer=_init_worker,
+                                 initargs=(data, initial_capital)) as executor:
+            futures = {executor.submit(_evaluate_combination, task): i
+                       for i, task in enumerate(tasks)}
+            for future in as_completed(futures):
+                i = futures[future]
+                result = future.result()
+                done.add(i)
+                yield i, result
+    except (BrokenProcessPool, pickle.PicklingError, AttributeError) as e:
+        print(f"警告: 無法以多行程回測，改為逐一執行: {str(e)}")
+        for i, (cls, params) in enumerate(tasks):
+            if i not in done:
+                yield i, _backtest_strategy(cls(**params), data, initial_capital)
+
+
+def _kernel_result(strategy: BaseStrategy, row, initial_capital: float) -> Dict[str, Any]:
+    """將融合核心輸出的指標列整理成與 _backtest_strategy 相同格式的結果字典"""
+    metrics = {'initial_capital': initial_capital}
+    metrics.update({name: float(value) for name, value in zip(METRIC_NAMES, row)})
+
+    return {
+        'strategy_name': strategy.name,
+        'parameters': strategy.get_params(),
+        'metrics': metrics
+    }
+
+
+def _sample_params(param_distributions: Dict[str, Any], rng: np.random.Generator) -> Dict[str, Any]:
+    """
+    依參數分佈抽樣一組參數
+
+    分佈可為具有 rvs() 的物件 (例如 scipy.stats.randint(10, 40))、
+    候選值列表 (均勻抽選) 或固定值。
+    """
+    params = {}
+    for name, dist in param_distributions.items():
+        if hasattr(dist, 'rvs'):
+            value = dist.rvs(random_state=rng)
+        elif isinstance(dist, (list, tuple)):
+            value = dist[rng.integers(len(dist))]
+        else:
+            value = dist
+
+        if isinstance(value, np.generic):
+            value = value.item()
+        params[name] = value
+
+    return params
+
+
+def _progress(iterable, total: int):
+    """以 tqdm 顯示進度條 (未安裝 tqdm 時直接回傳原迭代器)"""
+    try:
+        from tqdm import tqdm
+    except ImportError:
+        return iterable
+    return tqdm(iterable, total=total, desc='網格搜尋')
+
+
+def _print_summary(results: List[Dict[str, Any]]):
+    """以表格列出所有參數組合的主要績效"""
+    rows = [
+        {
+            **result['parameters'],
+            'total_return': result['metrics']['total_return'],
+            'max_drawdown': result['metrics']['max_drawdown'],
+            'sharpe_ratio': result['metrics']['sharpe_ratio']
+        }
+        for result in results
+    ]
+    print(pd.DataFrame(rows).to_string(index=False, float_format='{:.2f}'.format))
+
+
 class StrategyOptimizer:
     """策略優化器 (用於 AI 輔助)"""
 
@@ -34,57 +180,208 @@ class StrategyOptimizer:
         Returns:
             評估結果字典
         """
-        backtester = Backtester(initial_capital=self.initial_capital)
-        backtester.run(strategy, self.data)
-        metrics = backtester.summary()
-
-        result = {
-            'strategy_name': strategy.name,
-            'parameters': strategy.get_params(),
-            'metrics': metrics
-        }
+        result = _backtest_strategy(strategy, self.data, self.initial_capital)
 
         self.optimization_history.append(result)
         return result
 
-    def grid_search(self, strategy_class, param_grid: Dict[str, List]) -> List[Dict[str, Any]]:
+    def grid_search(self, strategy_class, param_grid: Dict[str, List],
+                    n_jobs: int = -1, verbose: int = 0,
+                    top_k: Optional[int] = None, fused: bool = True) -> List[Dict[str, Any]]:
         """
         網格搜尋最佳參數
 
+        內建策略在安裝 numba 時會使用融合核心 (ai._kernels) 一次評估整個網格；
+        其他情況下各參數組合會分散到多個行程平行回測。
+
         Args:
             strategy_class: 策略類別
             param_grid: 參數網格，例如 {'short_window': [10, 20, 30], 'long_window': [50, 60, 70]}
+            n_jobs: 平行行程數 (-1 代表使用所有 CPU 核心，1 代表不平行)
+            verbose: 輸出詳細程度 (0=不輸出, 1=進度條與結果總表, 2=另外逐筆輸出)
+            top_k: 只保留夏普比率最高的前 k 筆 (None 代表保留全部)，
+                   結果邊回傳邊篩選，不需暫存所有組合
+            fused: 是否嘗試使用融合核心 (不支援時自動改用一般回測)
 
         Returns:
-            所有測試結果的列表
+            依夏普比率由高到低排序的測試結果列表
         """
         from itertools import product
 
         # 生成所有參數組合
         param_names = list(param_grid.keys())
         param_values = list(param_grid.values())
-        param_combinations = list(product(*param_values))
+        param_list = [dict(zip(param_names, combination))
+                      for combination in product(*param_values)]
+
+        return self._search(strategy_class, param_list, self.data, n_jobs=n_jobs,
+                            verbose=verbose, top_k=top_k, fused=fused)
+
+    def random_search(self, strategy_class, param_distributions: Dict[str, Any],
+                      n_iter: int = 20, random_state: Optional[int] = None,
+                      n_jobs: int = -1, verbose: int = 0, top_k: Optional[int] = None,
+                      fused: bool = True) -> List[Dict[str, Any]]:
+        """
+        隨機搜尋參數
+
+        參數數量超過 2~3 個時，網格大小呈指數成長；隨機抽樣固定次數通常能以少很多的
+        回測次數找到相近品質的參數。
+
+        Args:
+            strategy_class: 策略類別
+            param_distributions: 參數分佈，例如
+                {'rsi_period': scipy.stats.randint(7, 28), 'rsi_oversold': [25, 30, 35]}
+            n_iter: 抽樣次數
+            random_state: 亂數種子
+            n_jobs, verbose, top_k, fused: 同 grid_search
+
+        Returns:
+            依夏普比率由高到低排序的測試結果列表
+        """
+        rng = np.random.default_rng(random_state)
+        param_list = [_sample_params(param_distributions, rng) for _ in range(n_iter)]
+
+        return self._search(strategy_class, param_list, self.data, n_jobs=n_jobs,
+                            verbose=verbose, top_k=top_k, fused=fused)
+
+    def successive_halving(self, strategy_class, param_distributions: Dict[str, Any],
+                           n_candidates: int = 27, eta: int = 3, min_samples: int = 250,
+                           random_state: Optional[int] = None, n_jobs: int = -1,
+                           verbose: int = 0, fused: bool = True) -> List[Dict[str, Any]]:
+        """
+        逐次減半搜尋 (Successive Halving)
 
+        先以最近一小段資料評估大量候選參數，每輪只保留前 1/eta 的組合，
+        並把資料長度放大 eta 倍，最後一輪才使用完整資料。
+
+        Args:
+            strategy_class: 策略類別
+            param_distributions: 參數分佈 (格式同 random_search)
+            n_candidates: 初始候選參數數量
+            eta: 每輪淘汰比例 (保留 1/eta，至少為 2)
+            min_samples: 每輪最少使用的資料筆數
+            random_state: 亂數種子
+            n_jobs, verbose, fused: 同 grid_search
+
+        Returns:
+            最後一輪 (完整資料) 依夏普比率由高到低排序的測試結果列表
+        """
+        if eta < 2:
+            raise ValueError("eta 必須至少為 2")
+
+        rng = np.random.default_rng(random_state)
+        param_list = [_sample_params(param_distributions, rng) for _ in range(n_candidates)]
+
+        # 每輪候選數量，例如 27 -> 9 -> 3 -> 1
+        sizes = [n_candidates]
+        while sizes[-1] > 1:
+            sizes.append(math.ceil(sizes[-1] / eta))
+
+        n_rounds = len(sizes)
+        total_len = len(self.data)
         results = []
 
-        for combination in param_combinations:
-            params = dict(zip(param_names, combination))
+        for round_idx in range(n_rounds):
+            last_round = round_idx == n_rounds - 1
+
+            length = total_len // (eta ** (n_rounds - 1 - round_idx))
+            length = min(total_len, max(min_samples, length))
+            window = self.data.iloc[-length:]
 
-            # 創建策略實例
-            strategy = strategy_class(**params)
+            keep = None if last_round else sizes[round_idx + 1]
+            results = self._search(strategy_class, param_list, window, n_jobs=n_jobs,
+                                   verbose=verbose, top_k=keep, fused=fused,
+                                   record=last_round)
 
-            # 評估策略
-            result = self.evaluate_strategy(strategy)
-            results.append(result)
+            if verbose >= 1:
+                print(f"第 {round_idx + 1}/{n_rounds} 輪: {len(param_list)} 組參數, "
+                      f"資料 {length} 筆")
 
-            print(f"測試參數: {params}")
-            print(f"總報酬: {result['metrics']['total_return']:.2f}%")
-            print(f"最大回撤: {result['metrics']['max_drawdown']:.2f}%")
-            print(f"夏普比率: {result['metrics']['sharpe_ratio']:.2f}")
-            print("-" * 50)
+            param_list = [result['parameters'] for result in results]
 
-        # 根據夏普比率排序
-        results.sort(key=lambda x: x['metrics']['sharpe_ratio'], reverse=True)
+        return results
+
+    def _search(self, strategy_class, param_list: List[Dict[str, Any]], data: pd.DataFrame,
+                n_jobs: int = -1, verbose: int = 0, top_k: Optional[int] = None,
+                fused: bool = True, record: bool = True) -> List[Dict[str, Any]]:
+        """
+        評估一組參數並依夏普比率排序 (各搜尋方法共用)
+
+        Args:
+            strategy_class: 策略類別
+            param_list: 參數字典列表
+            data: 回測資料
+            n_jobs, verbose, top_k, fused: 同 grid_search
+            record: 是否將結果加入 optimization_history
+
+        Returns:
+            依夏普比率由高到低排序的測試結果列表
+        """
+        tasks = [(strategy_class, params) for params in param_list]
+
+        if n_jobs is None or n_jobs < 1:
+            n_jobs = os.cpu_count() or 1
+        n_jobs = min(n_jobs, len(tasks))
+
+        fused_metrics = None
+        if fused:
+            strategies = [cls(**params) for cls, params in tasks]
+            commission = Backtester(initial_capital=self.initial_capital).commission
+            fused_metrics = evaluate_grid(strategies, data['close'].to_numpy(),
+                                          self.initial_capital, commission)
+
+        parallel = None
+        if fused_metrics is not None:
+            iterator = ((i, _kernel_result(strategy, row, self.initial_capital))
+                        for i, (strategy, row) in enumerate(zip(strategies, fused_metrics)))
+        elif n_jobs <= 1:
+            iterator = ((i, _backtest_strategy(cls(**params), data, self.initial_capital))
+                        for i, (cls, params) in enumerate(tasks))
+        else:
+            parallel = _parallel_results(tasks, data, self.initial_capital, n_jobs)
+            iterator = parallel
+
+        if verbose == 1:
+            iterator = _progress(iterator, total=len(tasks))
+
+        # top_k 模式以 (夏普比率, -序號) 維持大小為 k 的最小堆積，序號讓同分時依參數順序排列
+        collected = []
+        try:
+            for i, result in iterator:
+                if top_k is None:
+                    collected.append((i, result))
+                else:
+                    entry = (result['metrics']['sharpe_ratio'], -i, result)
+                    if len(collected) < top_k:
+                        heapq.heappush(collected, entry)
+                    else:
+                        heapq.heappushpop(collected, entry)
+
+                if verbose >= 2:
+                    print(f"測試參數: {result['parameters']}")
+                    print(f"總報酬: {result['metrics']['total_return']:.2f}%")
+                    print(f"最大回撤: {result['metrics']['max_drawdown']:.2f}%")
+                    print(f"夏普比率: {result['metrics']['sharpe_ratio']:.2f}")
+                    print("-" * 50)
+        finally:
+            # 提前中斷時關閉產生器，行程池隨之結束
+            if parallel is not None:
+                parallel.close()
+
+        if top_k is None:
+            results = [result for _, result in sorted(collected, key=lambda x: x[0])]
+            if record:
+                self.optimization_history.extend(results)
+
+            # 根據夏普比率排序
+            results.sort(key=lambda x: x['metrics']['sharpe_ratio'], reverse=True)
+        else:
+            results = [result for _, _, result in sorted(collected, reverse=True)]
+            if record:
+                self.optimization_history.extend(results)
+
+        if verbose >= 1:
+            _print_summary(results)
 
         return results
 
@@ -104,8 +401,7 @@ class StrategyOptimizer:
         Args:
             filename: 輸出檔案名稱
         """
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(self.optimization_history, f, indent=2, ensure_ascii=False)
+        dump_json(self.optimization_history, filename)
 
         print(f"結果已匯出至: {filename}")
 
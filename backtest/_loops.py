@@ -0,0 +1,75 @@
+"""
+回測核心迴圈 (Numba 加速)
+持倉狀態會延續到下一根 K 棒，無法單純向量化，改以 JIT 編譯的純量迴圈處理
+"""
+import numpy as np
+from utils._njit import njit, NUMBA_AVAILABLE
+
+
+# 明確指定型別簽章，讓 numba 在匯入時就完成編譯 (或讀取磁碟快取)
+_RUN_LOOP_SIGNATURE = 'Tuple((f8[:], f8[:], f8[:]))(f8[:], i1[:], f8, f8)'
+
+
+def _run_loop(close, signal, capital, commission):
+    """
+    全進全出的交易狀態機
+
+    Args:
+        close: 收盤價陣列
+        signal: int8 訊號陣列 (1 買入, -1 賣出)
+        capital: 初始資金
+        commission: 手續費率
+
+    Returns:
+        (holdings, cash, total) 三個與 close 等長的陣列
+    """
+    n = len(close)
+    holdings = np.zeros(n)
+    cash_arr = np.empty(n)
+    total = np.empty(n)
+
+    cash = capital
+    position = 0
+
+    if n > 0:
+        cash_arr[0] = capital
+        total[0] = capital
+
+    for i in range(1, n):
+        price = close[i]
+
+        # 買入訊號
+        if signal[i] > 0 and position == 0:
+            # 全部資金買入 (扣除手續費)
+            shares_to_buy = int((cash * (1 - commission)) / price)
+            cost = shares_to_buy * price
+            commission_cost = cost * commission
+
+            position = shares_to_buy
+            cash -= (cost + commission_cost)
+
+        # 賣出訊號
+        elif signal[i] < 0 and position > 0:
+            # 賣出全部持股 (扣除手續費)
+            revenue = position * price
+            commission_cost = revenue * commission
+
+            cash += (revenue - commission_cost)
+            position = 0
+
+        # 更新持倉價值
+        holdings[i] = position * price
+        cash_arr[i] = cash
+        total[i] = cash + position * price
+
+    return holdings, cash_arr, total
+
+
+# 編譯失敗時保留純 Python 版本，由呼叫端改用 NumPy 實作
+LOOP_COMPILED = False
+if NUMBA_AVAILABLE:
+    try:
+        _run_loop = njit(_RUN_LOOP_SIGNATURE, cache=True)(_run_loop)
+        LOOP_COMPILED = True
+    except Exception:
+        pass
@@ -3,8 +3,76 @@
 """
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 from strategies.base_strategy import BaseStrategy
+from backtest._loops import _run_loop, LOOP_COMPILED
+
+
+def _simulate_trades(close: np.ndarray, signal: np.ndarray,
+                     initial_capital: float,
+                     commission: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    以 NumPy 陣列模擬全進全出的交易狀態機
+
+    只有出現非零訊號的位置才可能改變持倉，因此僅需逐筆處理這些事件，
+    再把每次交易後的持股與現金以向前填補的方式展開回每一根 K 棒。
+
+    Args:
+        close: 收盤價陣列
+        signal: 訊號陣列 (1 買入, -1 賣出)
+        initial_capital: 初始資金
+        commission: 手續費率
+
+    Returns:
+        (holdings, cash, total) 三個與 close 等長的陣列
+    """
+    n = len(close)
+    position_level = np.zeros(n)
+    cash_level = np.full(n, float(initial_capital))
+    last_trade = np.zeros(n, dtype=np.int64)
+
+    cash = initial_capital
+    position = 0
+
+    # 第一根 K 棒不交易，與逐列迴圈的行為一致
+    event_idx = np.flatnonzero((signal[1:] > 0) | (signal[1:] < 0)) + 1
+
+    for i in event_idx:
+        price = close[i]
+
+        # 買入訊號
+        if signal[i] > 0 and position == 0:
+            # 全部資金買入 (扣除手續費)
+            shares_to_buy = int((cash * (1 - commission)) / price)
+            cost = shares_to_buy * price
+            commission_cost = cost * commission
+
+            position = shares_to_buy
+            cash -= (cost + commission_cost)
+
+        # 賣出訊號
+        elif signal[i] < 0 and position > 0:
+            # 賣出全部持股 (扣除手續費)
+            revenue = position * price
+            commission_cost = revenue * commission
+
+            cash += (revenue - commission_cost)
+            position = 0
+
+        else:
+            continue
+
+        position_level[i] = position
+        cash_level[i] = cash
+        last_trade[i] = i
+
+    # 每根 K 棒沿用最近一次交易後的狀態
+    last_trade = np.maximum.accumulate(last_trade)
+    positions = position_level[last_trade]
+    cash_series = cash_level[last_trade]
+    holdings = positions * close
+
+    return holdings, cash_series, cash_series + holdings
 
 
 class Backtester:
@@ -33,44 +101,28 @@ class Backtester:
         Returns:
             包含回測結果的 DataFrame
         """
-        # 使用策略生成訊號
-        df = strategy.generate_signals(data.copy())
-
-        # 計算持倉
-        df['holdings'] = 0
-        df['cash'] = self.initial_capital
-        df['total'] = self.initial_capital
-
-        cash = self.initial_capital
-        position = 0
+        # 使用策略生成訊號 (策略會回傳新的 DataFrame，不會修改 data)
+        df = strategy.generate_signals(data)
 
-        for i in range(1, len(df)):
-            signal = df.iloc[i]['signal']
-            price = df.iloc[i]['close']
+        # 訊號只有 -1/0/1，以 int8 儲存
+        df['signal'] = np.sign(df['signal'].fillna(0)).astype(np.int8)
 
-            # 買入訊號
-            if signal > 0 and position == 0:
-                # 全部資金買入 (扣除手續費)
-                shares_to_buy = int((cash * (1 - self.commission)) / price)
-                cost = shares_to_buy * price
-                commission_cost = cost * self.commission
-
-                position = shares_to_buy
-                cash -= (cost + commission_cost)
-
-            # 賣出訊號
-            elif signal < 0 and position > 0:
-                # 賣出全部持股 (扣除手續費)
-                revenue = position * price
-                commission_cost = revenue * self.commission
-
-                cash += (revenue - commission_cost)
-                position = 0
-
-            # 更新持倉價值
-            df.loc[df.index[i], 'holdings'] = position * price
-            df.loc[df.index[i], 'cash'] = cash
-            df.loc[df.index[i], 'total'] = cash + (position * price)
+        # 計算持倉
+        close = df['close'].to_numpy(dtype=np.float64)
+        signal = df['signal'].to_numpy()
+
+        if LOOP_COMPILED:
+            holdings, cash, total = _run_loop(close, signal,
+                                              float(self.initial_capital),
+                                              float(self.commission))
+        else:
+            holdings, cash, total = _simulate_trades(close, signal,
+                                                     self.initial_capital,
+                                                     self.commission)
+
+        df['holdings'] = holdings
+        df['cash'] = cash
+        df['total'] = total
 
         self.results = df
         return df
@@ -99,8 +151,9 @@ class Backtester:
 
         from backtest.evaluation import calculate_metrics
 
-        portfolio_value = self.get_portfolio_value()
-        returns = self.get_returns()
+        # 報酬率只計算一次，並直接以 ndarray 傳入各指標
+        portfolio_value = self.results['total'].to_numpy(dtype=np.float64)
+        returns = np.diff(portfolio_value) / portfolio_value[:-1]
 
         metrics = calculate_metrics(portfolio_value, returns, self.initial_capital)
 
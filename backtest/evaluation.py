@@ -2,34 +2,35 @@
 回測評估指標
 計算 MDD (最大回撤), 勝率, CAGR 等指標
 """
+import math
 import pandas as pd
 import numpy as np
-from typing import Dict, Any
+from typing import Dict, Any, Union
 
 
-def calculate_max_drawdown(portfolio_value: pd.Series) -> float:
+def calculate_max_drawdown(portfolio_value: Union[pd.Series, np.ndarray]) -> float:
     """
     計算最大回撤 (Maximum Drawdown)
 
     Args:
-        portfolio_value: 投資組合價值時間序列
+        portfolio_value: 投資組合價值時間序列 (Series 或 ndarray)
 
     Returns:
         最大回撤百分比 (負數)
     """
-    cummax = portfolio_value.cummax()
-    drawdown = (portfolio_value - cummax) / cummax
-    max_drawdown = drawdown.min()
+    values = np.asarray(portfolio_value, dtype=np.float64)
+    cummax = np.maximum.accumulate(values)
+    max_drawdown = float(((values - cummax) / cummax).min())
 
     return max_drawdown
 
 
-def calculate_cagr(portfolio_value: pd.Series, years: float = None) -> float:
+def calculate_cagr(portfolio_value: Union[pd.Series, np.ndarray], years: float = None) -> float:
     """
     計算年化報酬率 (CAGR - Compound Annual Growth Rate)
 
     Args:
-        portfolio_value: 投資組合價值時間序列
+        portfolio_value: 投資組合價值時間序列 (Series 或 ndarray)
         years: 投資年數 (如果為 None，會自動計算)
 
     Returns:
@@ -39,35 +40,51 @@ def calculate_cagr(portfolio_value: pd.Series, years: float = None) -> float:
         # 假設每個數據點是一天
         years = len(portfolio_value) / 252  # 252 個交易日
 
-    initial_value = portfolio_value.iloc[0]
-    final_value = portfolio_value.iloc[-1]
+    values = np.asarray(portfolio_value, dtype=np.float64)
+    initial_value = values[0]
+    final_value = values[-1]
 
-    if initial_value <= 0 or years <= 0:
+    if initial_value <= 0 or years <= 0 or final_value == initial_value:
+        # 沒有交易時最終價值等於初始價值，不必計算 log/exp
         return 0.0
 
-    cagr = (pow(final_value / initial_value, 1 / years) - 1) * 100
+    if final_value <= 0:
+        # 資金歸零，log 無定義
+        return -100.0
+
+    ratio = final_value / initial_value
+    cagr = (math.exp(math.log(ratio) / years) - 1.0) * 100.0
 
     return cagr
 
 
-def calculate_sharpe_ratio(returns: pd.Series, risk_free_rate: float = 0.02) -> float:
+def calculate_sharpe_ratio(returns: Union[pd.Series, np.ndarray],
+                           risk_free_rate: float = 0.02) -> float:
     """
     計算夏普比率 (Sharpe Ratio)
 
     Args:
-        returns: 報酬率時間序列
+        returns: 報酬率時間序列 (Series 或 ndarray，NaN 會被忽略)
         risk_free_rate: 無風險利率 (年化，預設 2%)
 
     Returns:
         夏普比率
     """
+    values = np.asarray(returns, dtype=np.float64)
+    values = values[~np.isnan(values)]
+
+    # 報酬全為 0 (沒有交易) 時直接回傳，避免常數序列的 std 因浮點誤差不為 0
+    if not np.any(values):
+        return 0.0
+
     # 計算超額報酬
-    excess_returns = returns - (risk_free_rate / 252)
+    excess_returns = values - (risk_free_rate / 252)
 
-    if excess_returns.std() == 0:
+    std = excess_returns.std(ddof=1)
+    if std == 0:
         return 0.0
 
-    sharpe = np.sqrt(252) * (excess_returns.mean() / excess_returns.std())
+    sharpe = float(np.sqrt(252) * (excess_returns.mean() / std))
 
     return sharpe
 
@@ -95,17 +112,24 @@ def calculate_win_rate(signals: pd.Series, returns: pd.Series) -> Dict[str, Any]
         }
 
     # 計算每筆交易的報酬
-    trade_returns = []
-    position = 0
-
-    for i in range(len(signals)):
-        if signals.iloc[i] > 0:  # 買入
-            position = i
-        elif signals.iloc[i] < 0 and position > 0:  # 賣出
-            # 計算這段持有期間的報酬
-            trade_return = returns.iloc[position:i+1].sum()
-            trade_returns.append(trade_return)
-            position = 0
+    sig = signals.to_numpy(dtype=np.float64)
+    idx = np.arange(len(sig))
+
+    # 每根 K 棒之前 (含當根) 最近一次買入的位置，-1 表示尚未買入
+    last_buy = np.maximum.accumulate(np.where(sig > 0, idx, -1))
+
+    sell_idx = np.flatnonzero(sig < 0)
+    entry_idx = last_buy[sell_idx]
+
+    # 前一次賣出之後有新的買入才算一筆交易 (位置 0 的買入不計，與原本的持倉判斷一致)
+    prev_sell = np.concatenate(([0], sell_idx[:-1]))
+    valid = (entry_idx > 0) & (entry_idx > prev_sell)
+    entry_idx = entry_idx[valid]
+    exit_idx = sell_idx[valid]
+
+    # 以累積和一次算出每段持有期間的報酬總和
+    cumret = np.concatenate(([0.0], np.nan_to_num(returns.to_numpy(dtype=np.float64)).cumsum()))
+    trade_returns = cumret[exit_idx + 1] - cumret[entry_idx]
 
     if len(trade_returns) == 0:
         return {
@@ -115,8 +139,8 @@ def calculate_win_rate(signals: pd.Series, returns: pd.Series) -> Dict[str, Any]
             'win_rate': 0.0
         }
 
-    winning_trades = sum(1 for r in trade_returns if r > 0)
-    losing_trades = sum(1 for r in trade_returns if r <= 0)
+    winning_trades = int((trade_returns > 0).sum())
+    losing_trades = int((trade_returns <= 0).sum())
     win_rate = (winning_trades / len(trade_returns)) * 100
 
     return {
@@ -127,30 +151,37 @@ def calculate_win_rate(signals: pd.Series, returns: pd.Series) -> Dict[str, Any]
     }
 
 
-def calculate_metrics(portfolio_value: pd.Series, returns: pd.Series,
-                      initial_capital: float) -> Dict[str, Any]:
+def calculate_metrics(portfolio_value: Union[pd.Series, np.ndarray],
+                      returns: Union[pd.Series, np.ndarray],
+                      initial_capital: float, years: float = None) -> Dict[str, Any]:
     """
     計算所有評估指標
 
     Args:
-        portfolio_value: 投資組合價值時間序列
-        returns: 報酬率時間序列
+        portfolio_value: 投資組合價值時間序列 (Series 或 ndarray)
+        returns: 報酬率時間序列 (Series 或 ndarray，NaN 會被忽略)
         initial_capital: 初始資金
+        years: 投資年數 (同一份資料評估多個策略時可預先計算傳入，None 則自動計算)
 
     Returns:
         包含所有指標的字典
     """
-    final_value = portfolio_value.iloc[-1]
+    # 只轉換一次，後續各指標直接使用 ndarray
+    values = np.asarray(portfolio_value, dtype=np.float64)
+    rets = np.asarray(returns, dtype=np.float64)
+    rets = rets[~np.isnan(rets)]
+
+    final_value = values[-1]
     total_return = ((final_value - initial_capital) / initial_capital) * 100
 
     metrics = {
         'initial_capital': initial_capital,
         'final_value': final_value,
         'total_return': total_return,
-        'max_drawdown': calculate_max_drawdown(portfolio_value) * 100,
-        'cagr': calculate_cagr(portfolio_value),
-        'sharpe_ratio': calculate_sharpe_ratio(returns),
-        'volatility': returns.std() * np.sqrt(252) * 100,  # 年化波動率
+        'max_drawdown': calculate_max_drawdown(values) * 100,
+        'cagr': calculate_cagr(values, years),
+        'sharpe_ratio': calculate_sharpe_ratio(rets),
+        'volatility': rets.std(ddof=1) * np.sqrt(252) * 100,  # 年化波動率
     }
 
     return metrics
@@ -4,24 +4,26 @@
 """
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-import json
 
 # 加入專案根目錄到路徑
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils.fetch import load_stock_data
+from utils.json_io import dump_json
 from strategies.momentum import MomentumStrategy
 from strategies.mean_reversion import MeanReversionStrategy
 
 
-def generate_signals(symbols: list = None, output_file: str = None):
+def generate_signals(symbols: list = None, output_file: str = None, max_workers: int = 8):
     """
     為多支股票生成交易訊號
 
     Args:
         symbols: 股票代碼列表
         output_file: 輸出 JSON 檔案路徑
+        max_workers: 同時載入資料的執行緒數
     """
     if symbols is None:
         symbols = ['2330', '0050', '0056', '2317', '2454']
@@ -36,14 +38,18 @@ def generate_signals(symbols: list = None, output_file: str = None):
     momentum = MomentumStrategy(short_window=20, long_window=60)
     mean_reversion = MeanReversionStrategy(rsi_period=14, rsi_oversold=30, rsi_overbought=70)
 
+    # 讀檔屬於 I/O，先以執行緒池同時載入所有股票
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        loaded = {symbol: executor.submit(load_stock_data, symbol) for symbol in symbols}
+
     all_signals = {}
 
     for symbol in symbols:
         try:
             print(f"分析 {symbol}...")
 
-            # 載入資料
-            df = load_stock_data(symbol)
+            # 取得載入結果
+            df = loaded[symbol].result()
 
             if df is None or len(df) < 100:
                 print(f"✗ {symbol} 資料不足")
@@ -94,8 +100,7 @@ def generate_signals(symbols: list = None, output_file: str = None):
         print()
 
     # 儲存到 JSON
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(all_signals, f, indent=2, ensure_ascii=False)
+    dump_json(all_signals, output_file)
 
     print(f"=== 訊號已儲存至: {output_file} ===")
 
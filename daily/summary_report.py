@@ -2,8 +2,10 @@
 每日摘要報告生成器
 自動產生當日交易建議與市場分析報告
 """
+import io
 import sys
 import os
+from collections import Counter
 from datetime import datetime
 import json
 
@@ -28,71 +30,75 @@ def generate_text_report(signals_file: str, output_file: str = None):
         signals = json.load(f)
 
     # 生成報告
-    report = []
-    report.append("=" * 60)
-    report.append(f"每日交易建議報告")
-    report.append(f"日期: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    report.append("=" * 60)
-    report.append("")
+    buf = io.StringIO()
+    w = buf.write
+    w("=" * 60 + "\n")
+    w(f"每日交易建議報告\n")
+    w(f"日期: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+    w("=" * 60 + "\n")
+    w("\n")
 
     # 統計
-    buy_signals = [s for s in signals.keys() if signals[s]['recommendation'] == '買入']
-    sell_signals = [s for s in signals.keys() if signals[s]['recommendation'] == '賣出']
-    hold_signals = [s for s in signals.keys() if signals[s]['recommendation'] == '持有']
+    buy_signals, sell_signals, hold_signals = [], [], []
+    groups = {'買入': buy_signals, '賣出': sell_signals, '持有': hold_signals}
+    for symbol, data in signals.items():
+        group = groups.get(data['recommendation'])
+        if group is not None:
+            group.append(symbol)
 
-    report.append("📊 訊號統計")
-    report.append(f"  買入訊號: {len(buy_signals)} 檔")
-    report.append(f"  賣出訊號: {len(sell_signals)} 檔")
-    report.append(f"  持有: {len(hold_signals)} 檔")
-    report.append("")
+    w("📊 訊號統計\n")
+    w(f"  買入訊號: {len(buy_signals)} 檔\n")
+    w(f"  賣出訊號: {len(sell_signals)} 檔\n")
+    w(f"  持有: {len(hold_signals)} 檔\n")
+    w("\n")
 
     # 買入建議
     if buy_signals:
-        report.append("🔥 買入建議")
-        report.append("-" * 60)
+        w("🔥 買入建議\n")
+        w("-" * 60 + "\n")
         for symbol in buy_signals:
             data = signals[symbol]
-            report.append(f"股票代號: {symbol}")
-            report.append(f"  收盤價: {data['close']:.2f}")
-            report.append(f"  動量訊號: {'買入' if data['momentum']['signal'] > 0 else '持有'}")
-            report.append(f"    SMA20: {data['momentum']['SMA20']:.2f}")
-            report.append(f"    SMA60: {data['momentum']['SMA60']:.2f}")
-            report.append(f"  均值回歸訊號: {'買入' if data['mean_reversion']['signal'] > 0 else '持有'}")
-            report.append(f"    RSI: {data['mean_reversion']['RSI']:.2f}")
-            report.append("")
+            w(f"股票代號: {symbol}\n")
+            w(f"  收盤價: {data['close']:.2f}\n")
+            w(f"  動量訊號: {'買入' if data['momentum']['signal'] > 0 else '持有'}\n")
+            w(f"    SMA20: {data['momentum']['SMA20']:.2f}\n")
+            w(f"    SMA60: {data['momentum']['SMA60']:.2f}\n")
+            w(f"  均值回歸訊號: {'買入' if data['mean_reversion']['signal'] > 0 else '持有'}\n")
+            w(f"    RSI: {data['mean_reversion']['RSI']:.2f}\n")
+            w("\n")
 
     # 賣出建議
     if sell_signals:
-        report.append("⚠️  賣出建議")
-        report.append("-" * 60)
+        w("⚠️  賣出建議\n")
+        w("-" * 60 + "\n")
         for symbol in sell_signals:
             data = signals[symbol]
-            report.append(f"股票代號: {symbol}")
-            report.append(f"  收盤價: {data['close']:.2f}")
-            report.append(f"  動量訊號: {'賣出' if data['momentum']['signal'] < 0 else '持有'}")
-            report.append(f"  均值回歸訊號: {'賣出' if data['mean_reversion']['signal'] < 0 else '持有'}")
-            report.append(f"    RSI: {data['mean_reversion']['RSI']:.2f}")
-            report.append("")
+            w(f"股票代號: {symbol}\n")
+            w(f"  收盤價: {data['close']:.2f}\n")
+            w(f"  動量訊號: {'賣出' if data['momentum']['signal'] < 0 else '持有'}\n")
+            w(f"  均值回歸訊號: {'賣出' if data['mean_reversion']['signal'] < 0 else '持有'}\n")
+            w(f"    RSI: {data['mean_reversion']['RSI']:.2f}\n")
+            w("\n")
 
     # 持有部位
     if hold_signals:
-        report.append("📌 持有部位")
-        report.append("-" * 60)
+        w("📌 持有部位\n")
+        w("-" * 60 + "\n")
         for symbol in hold_signals:
             data = signals[symbol]
-            report.append(f"{symbol}: {data['close']:.2f} | RSI: {data['mean_reversion']['RSI']:.2f}")
+            w(f"{symbol}: {data['close']:.2f} | RSI: {data['mean_reversion']['RSI']:.2f}\n")
 
-    report.append("")
-    report.append("=" * 60)
-    report.append("⚠️  免責聲明: 本報告僅供參考，不構成投資建議")
-    report.append("=" * 60)
+    w("\n")
+    w("=" * 60 + "\n")
+    w("⚠️  免責聲明: 本報告僅供參考，不構成投資建議\n")
+    w("=" * 60 + "\n")
 
     # 寫入檔案
-    report_text = "\n".join(report)
+    report_text = buf.getvalue()
     with open(output_file, 'w', encoding='utf-8') as f:
         f.write(report_text)
 
-    print(report_text)
+    print(report_text, end='')
     print(f"\n報告已儲存至: {output_file}")
 
     return report_text
@@ -114,7 +120,10 @@ def generate_html_report(signals_file: str, output_file: str = None):
     with open(signals_file, 'r', encoding='utf-8') as f:
         signals = json.load(f)
 
-    html = f"""
+    buf = io.StringIO()
+    w = buf.write
+
+    w(f"""
 <!DOCTYPE html>
 <html lang="zh-TW">
 <head>
@@ -141,18 +150,19 @@ def generate_html_report(signals_file: str, output_file: str = None):
 
         <div class="summary">
             <h2>訊號統計</h2>
-"""
+""")
 
-    buy_count = sum(1 for s in signals.values() if s['recommendation'] == '買入')
-    sell_count = sum(1 for s in signals.values() if s['recommendation'] == '賣出')
-    hold_count = sum(1 for s in signals.values() if s['recommendation'] == '持有')
+    counts = Counter(s['recommendation'] for s in signals.values())
+    buy_count = counts['買入']
+    sell_count = counts['賣出']
+    hold_count = counts['持有']
 
-    html += f"""
+    w(f"""
             <div class="metric">🔥 買入: {buy_count}</div>
             <div class="metric">⚠️ 賣出: {sell_count}</div>
             <div class="metric">📌 持有: {hold_count}</div>
         </div>
-"""
+""")
 
     for symbol, data in signals.items():
         rec_class = data['recommendation']
@@ -163,26 +173,26 @@ def generate_html_report(signals_file: str, output_file: str = None):
         else:
             rec_class = 'hold'
 
-        html += f"""
+        w(f"""
         <div class="stock-card {rec_class}">
             <h3>{symbol} - {data['recommendation']}</h3>
             <p><strong>收盤價:</strong> {data['close']:.2f}</p>
             <p><strong>動量指標:</strong> SMA20={data['momentum']['SMA20']:.2f}, SMA60={data['momentum']['SMA60']:.2f}</p>
             <p><strong>RSI:</strong> {data['mean_reversion']['RSI']:.2f}</p>
         </div>
-"""
+""")
 
-    html += """
+    w("""
         <div class="disclaimer">
             <strong>⚠️ 免責聲明:</strong> 本報告僅供參考，不構成投資建議。投資有風險，請謹慎評估。
         </div>
     </div>
 </body>
 </html>
-"""
+""")
 
     with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(html)
+        f.write(buf.getvalue())
 
     print(f"HTML 報告已儲存至: {output_file}")
 
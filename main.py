@@ -6,7 +6,7 @@ import argparse
 import sys
 from datetime import datetime
 
-from utils.fetch import fetch_stock_data, save_stock_data, load_stock_data
+from utils.fetch import fetch_many, save_stock_data, load_stock_data
 from strategies.momentum import MomentumStrategy
 from strategies.mean_reversion import MeanReversionStrategy
 from backtest.backtester import Backtester
@@ -23,10 +23,13 @@ def fetch_data(symbols: list, source: str = 'yfinance'):
     """
     print(f"\n=== 開始抓取資料 ({datetime.now().strftime('%Y-%m-%d %H:%M:%S')}) ===\n")
 
+    # 各股票的下載同時進行，之後再依序儲存
+    print(f"正在抓取 {len(symbols)} 支股票...\n")
+    fetched = fetch_many(symbols, source=source)
+
     for symbol in symbols:
         try:
-            print(f"正在抓取 {symbol}...")
-            df = fetch_stock_data(symbol, source=source)
+            df = fetched[symbol]
 
             if df is not None:
                 save_stock_data(symbol, df, data_type='raw')
@@ -127,7 +130,7 @@ def optimize_strategy(symbol: str, strategy_name: str = 'momentum'):
         return
 
     # 執行優化
-    results = optimizer.grid_search(strategy_class, param_grid)
+    results = optimizer.grid_search(strategy_class, param_grid, verbose=1)
 
     # 顯示最佳結果
     best = results[0]
@@ -26,6 +26,8 @@ class BaseStrategy(ABC):
         """
         生成交易訊號
 
+        實作不可修改傳入的 data，須回傳新的 DataFrame
+
         Args:
             data: 包含價格資料的 DataFrame (必須有 'close' 欄位)
 
@@ -35,18 +37,40 @@ class BaseStrategy(ABC):
         pass
 
     @abstractmethod
-    def calculate_indicators(self, data: pd.DataFrame) -> pd.DataFrame:
+    def calculate_indicators(self, data: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
         """
         計算技術指標
 
         Args:
             data: 原始價格資料
+            inplace: 是否直接把指標欄位寫入 data (預設 False，回傳與 data 共用原有欄位的新 DataFrame)
 
         Returns:
-            DataFrame 加上計算的指標欄位
+            DataFrame 加上計算的指標欄位 (inplace=True 時即為 data 本身)
         """
         pass
 
+    @staticmethod
+    def _with_columns(data: pd.DataFrame, columns: Dict[str, Any]) -> pd.DataFrame:
+        """
+        回傳 data 加上指標欄位的新 DataFrame
+
+        以淺複製加入欄位：原有欄位不複製，與 data 共用記憶體 (不可就地修改)，
+        data 本身不會多出欄位；同名欄位會以新的陣列取代
+
+        Args:
+            data: 原始價格資料
+            columns: {欄位名稱: 序列或陣列}
+
+        Returns:
+            新的 DataFrame
+        """
+        df = data.copy(deep=False)
+        for name, values in columns.items():
+            df[name] = values
+
+        return df
+
     def get_params(self) -> Dict[str, Any]:
         """取得策略參數"""
         return self.params
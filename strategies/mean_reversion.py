@@ -2,9 +2,11 @@
 均值回歸策略 (Mean Reversion Strategy)
 使用 RSI 和 ATR 指標
 """
+import numpy as np
 import pandas as pd
 from .base_strategy import BaseStrategy
-from utils.indicators import calculate_rsi, calculate_atr
+from utils.indicator_cache import cached_rsi_soa, cached_atr_soa
+from utils.price_arrays import PriceArrays
 
 
 class MeanReversionStrategy(BaseStrategy):
@@ -32,25 +34,31 @@ class MeanReversionStrategy(BaseStrategy):
         }
         super().__init__(name='MeanReversion', params=params)
 
-    def calculate_indicators(self, data: pd.DataFrame) -> pd.DataFrame:
+    def calculate_indicators(self, data: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
         """
         計算 RSI 和 ATR 指標
 
         Args:
             data: 必須包含 'close', 'high', 'low' 欄位
+            inplace: 是否直接把指標欄位寫入 data (預設 False，回傳與 data 共用原有欄位的新 DataFrame)
 
         Returns:
             DataFrame 加上 'RSI' 和 'ATR' 欄位
         """
-        df = data.copy()
-
         rsi_period = self.params['rsi_period']
         atr_period = self.params['atr_period']
 
-        df['RSI'] = calculate_rsi(df['close'], rsi_period)
-        df['ATR'] = calculate_atr(df['high'], df['low'], df['close'], atr_period)
+        # 轉為 float32 陣列一次，指標直接在陣列上計算
+        prices = PriceArrays.from_df(data, columns=('high', 'low', 'close'))
+        rsi = cached_rsi_soa(prices.close, rsi_period)
+        atr = cached_atr_soa(prices.high, prices.low, prices.close, atr_period)
 
-        return df
+        if inplace:
+            data['RSI'] = rsi
+            data['ATR'] = atr
+            return data
+
+        return self._with_columns(data, {'RSI': rsi, 'ATR': atr})
 
     def generate_signals(self, data: pd.DataFrame) -> pd.DataFrame:
         """
@@ -71,17 +79,14 @@ class MeanReversionStrategy(BaseStrategy):
         rsi_overbought = self.params['rsi_overbought']
         atr_multiplier = self.params['atr_multiplier']
 
-        # 初始化欄位
-        df['signal'] = 0
-        df['position'] = 0
-
-        # 超賣時買入
-        df.loc[df['RSI'] < rsi_oversold, 'signal'] = 1
+        rsi = df['RSI'].to_numpy()
 
-        # 超買時賣出
-        df.loc[df['RSI'] > rsi_overbought, 'signal'] = -1
+        # 超賣時買入、超買時賣出 (兩者同時成立時以賣出為準)
+        df['signal'] = np.where(rsi > rsi_overbought, -1,
+                                np.where(rsi < rsi_oversold, 1, 0)).astype(np.int8)
+        df['position'] = np.zeros(len(df), dtype=np.int8)
 
         # 計算停損位 (使用 ATR)
-        df['stop_loss'] = df['close'] - (df['ATR'] * atr_multiplier)
+        df['stop_loss'] = df['close'].to_numpy() - df['ATR'].to_numpy() * atr_multiplier
 
         return df
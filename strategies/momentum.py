@@ -2,9 +2,10 @@
 動量策略 (Momentum Strategy)
 使用 SMA20 / SMA60 進行趨勢追蹤
 """
+import numpy as np
 import pandas as pd
 from .base_strategy import BaseStrategy
-from utils.indicators import calculate_sma
+from utils.indicator_cache import cached_smas
 
 
 class MomentumStrategy(BaseStrategy):
@@ -24,25 +25,30 @@ class MomentumStrategy(BaseStrategy):
         }
         super().__init__(name='Momentum', params=params)
 
-    def calculate_indicators(self, data: pd.DataFrame) -> pd.DataFrame:
+    def calculate_indicators(self, data: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
         """
         計算 SMA20 和 SMA60
 
         Args:
             data: 必須包含 'close' 欄位
+            inplace: 是否直接把指標欄位寫入 data (預設 False，回傳與 data 共用原有欄位的新 DataFrame)
 
         Returns:
             DataFrame 加上 'SMA20' 和 'SMA60' 欄位
         """
-        df = data.copy()
-
         short_window = self.params['short_window']
         long_window = self.params['long_window']
 
-        df[f'SMA{short_window}'] = calculate_sma(df['close'], short_window)
-        df[f'SMA{long_window}'] = calculate_sma(df['close'], long_window)
+        # 兩條均線共用同一次前綴和計算
+        smas = cached_smas(data['close'], (short_window, long_window))
+        columns = {f'SMA{window}': smas[window] for window in (short_window, long_window)}
 
-        return df
+        if inplace:
+            for name, values in columns.items():
+                data[name] = values
+            return data
+
+        return self._with_columns(data, columns)
 
     def generate_signals(self, data: pd.DataFrame) -> pd.DataFrame:
         """
@@ -62,14 +68,16 @@ class MomentumStrategy(BaseStrategy):
         short_window = self.params['short_window']
         long_window = self.params['long_window']
 
-        # 初始化訊號欄位
-        df['signal'] = 0
-        df['position'] = 0
+        # 當短期均線 > 長期均線時，為多頭趨勢 (持有)；只有 0 / 1，使用 int8
+        position = (df[f'SMA{short_window}'].to_numpy()
+                    > df[f'SMA{long_window}'].to_numpy()).astype(np.int8)
 
-        # 當短期均線 > 長期均線時，為多頭趨勢 (持有)
-        df.loc[df[f'SMA{short_window}'] > df[f'SMA{long_window}'], 'position'] = 1
+        # 計算交易訊號 (position 的變化，第一筆為 0)
+        signal = np.empty_like(position)
+        signal[:1] = 0
+        np.subtract(position[1:], position[:-1], out=signal[1:])
 
-        # 計算交易訊號 (position 的變化)
-        df['signal'] = df['position'].diff()
+        df['signal'] = signal
+        df['position'] = position
 
         return df
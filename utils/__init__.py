@@ -4,17 +4,22 @@
 """
 from .indicators import (
     calculate_sma,
+    calculate_smas,
     calculate_ema,
     calculate_rsi,
+    calculate_rsi_soa,
     calculate_atr,
+    calculate_atr_soa,
     calculate_bollinger_bands,
     calculate_macd,
     calculate_stochastic,
+    calculate_stochastic_soa,
     calculate_obv
 )
 
 from .fetch import (
     fetch_stock_data,
+    fetch_many,
     fetch_from_finmind,
     fetch_from_yfinance,
     save_stock_data,
@@ -22,31 +27,81 @@ from .fetch import (
     update_stock_data
 )
 
-from .plot import (
-    plot_price_with_indicators,
-    plot_backtest_results,
-    plot_rsi,
-    plot_returns_distribution,
-    plot_drawdown
+from .price_arrays import PriceArrays
+
+from .indicator_cache import (
+    memoize_indicator,
+    clear_indicator_cache,
+    cached_sma,
+    cached_smas,
+    cached_rsi,
+    cached_atr,
+    cached_rsi_soa,
+    cached_atr_soa
+)
+
+from .incremental import (
+    RsiState,
+    SmaState,
+    init_rsi_state,
+    update_rsi,
+    init_sma_state,
+    update_sma
+)
+
+from .json_io import dump_json
+
+# 繪圖函式依賴 matplotlib (匯入很慢)，第一次存取時才載入 utils.plot
+_PLOT_FUNCTIONS = (
+    'plot_price_with_indicators',
+    'plot_backtest_results',
+    'plot_rsi',
+    'plot_returns_distribution',
+    'plot_drawdown'
 )
 
 __all__ = [
     # Indicators
     'calculate_sma',
+    'calculate_smas',
     'calculate_ema',
     'calculate_rsi',
+    'calculate_rsi_soa',
     'calculate_atr',
+    'calculate_atr_soa',
     'calculate_bollinger_bands',
     'calculate_macd',
     'calculate_stochastic',
+    'calculate_stochastic_soa',
     'calculate_obv',
     # Fetch
     'fetch_stock_data',
+    'fetch_many',
     'fetch_from_finmind',
     'fetch_from_yfinance',
     'save_stock_data',
     'load_stock_data',
     'update_stock_data',
+    # Price arrays
+    'PriceArrays',
+    # Indicator cache
+    'memoize_indicator',
+    'clear_indicator_cache',
+    'cached_sma',
+    'cached_smas',
+    'cached_rsi',
+    'cached_atr',
+    'cached_rsi_soa',
+    'cached_atr_soa',
+    # Incremental
+    'RsiState',
+    'SmaState',
+    'init_rsi_state',
+    'update_rsi',
+    'init_sma_state',
+    'update_sma',
+    # JSON
+    'dump_json',
     # Plot
     'plot_price_with_indicators',
     'plot_backtest_results',
@@ -54,3 +109,11 @@ __all__ = [
     'plot_returns_distribution',
     'plot_drawdown'
 ]
+
+
+def __getattr__(name):
+    """延遲載入繪圖函式"""
+    if name in _PLOT_FUNCTIONS:
+        from . import plot
+        return getattr(plot, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,20 @@
+"""
+Numba 相容層
+未安裝 numba 時，njit 會退化為不做任何事的裝飾器，程式仍可用純 Python 執行
+"""
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """numba.njit 的替代品 (支援 @njit 與 @njit(...) 兩種寫法)"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+
+        return decorator
@@ -0,0 +1,67 @@
+"""
+磁碟快取
+將耗時的網路抓取結果以 pickle 存到本機，相同參數在有效期限內直接讀檔
+"""
+import hashlib
+import os
+import pickle
+import threading
+import time
+from functools import wraps
+
+
+def disk_cache(cache_dir: str = '.cache/fetch', ttl: float = 86400, cacheable=None):
+    """
+    以函式名稱與參數為鍵的磁碟快取裝飾器
+
+    回傳 None 的結果 (例如抓取失敗) 不會寫入快取；寫入快取失敗時仍回傳計算結果。
+
+    Args:
+        cache_dir: 快取目錄
+        ttl: 快取有效秒數 (預設一天)，None 表示永不過期
+        cacheable: 以相同參數呼叫、回傳是否可使用快取的函式 (None 表示一律快取)
+
+    Returns:
+        裝飾器
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if cacheable is not None and not cacheable(*args, **kwargs):
+                return func(*args, **kwargs)
+
+            raw_key = f'{func.__module__}.{func.__qualname__}:{args!r}:{sorted(kwargs.items())!r}'
+            key = hashlib.sha256(raw_key.encode('utf-8')).hexdigest()
+            path = os.path.join(cache_dir, f'{key}.pkl')
+
+            try:
+                if ttl is None or time.time() - os.path.getmtime(path) < ttl:
+                    with open(path, 'rb') as f:
+                        return pickle.load(f)
+            except (OSError, pickle.PickleError, EOFError):
+                # 快取不存在或損毀時重新計算
+                pass
+
+            result = func(*args, **kwargs)
+
+            if result is not None:
+                # 先寫暫存檔再改名，避免同時執行時讀到寫到一半的檔案
+                tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+                try:
+                    os.makedirs(cache_dir, exist_ok=True)
+                    with open(tmp_path, 'wb') as f:
+                        pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+                    os.replace(tmp_path, path)
+                except OSError as e:
+                    # 快取只是加速用，寫入失敗不影響已取得的結果
+                    print(f"警告: 無法寫入快取 {path}: {str(e)}")
+                    try:
+                        os.remove(tmp_path)
+                    except OSError:
+                        pass
+
+            return result
+
+        return wrapper
+
+    return decorator
@@ -4,7 +4,47 @@
 """
 import pandas as pd
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Dict, List
+from importlib.util import find_spec
+import threading
+
+from .disk_cache import disk_cache
+
+
+# 有安裝 pyarrow 時以 Parquet 儲存 (欄式、有型別、保留 DatetimeIndex)，否則使用 CSV
+PARQUET_AVAILABLE = find_spec('pyarrow') is not None
+
+# 資料來源的 client 只在第一次使用時建立，之後重複使用
+_finmind_loader = None
+_yfinance = None
+_client_lock = threading.Lock()
+
+# 同時進行中的 API 請求上限 (跨所有 fetch_many 呼叫)，避免超過資料來源的頻率限制
+MAX_CONCURRENT_REQUESTS = 4
+_request_slots = threading.BoundedSemaphore(MAX_CONCURRENT_REQUESTS)
+
+
+def _get_finmind_loader():
+    """取得共用的 FinMind DataLoader (未安裝 FinMind 時拋出 ImportError)"""
+    global _finmind_loader
+    if _finmind_loader is None:
+        with _client_lock:
+            if _finmind_loader is None:
+                from FinMind.data import DataLoader
+                _finmind_loader = DataLoader()
+    return _finmind_loader
+
+
+def _get_yfinance():
+    """取得 yfinance 模組 (未安裝時拋出 ImportError)"""
+    global _yfinance
+    if _yfinance is None:
+        import yfinance
+        _yfinance = yfinance
+    return _yfinance
 
 
 def fetch_stock_data(symbol: str, start_date: str = None, end_date: str = None,
@@ -36,6 +76,50 @@ def fetch_stock_data(symbol: str, start_date: str = None, end_date: str = None,
         raise ValueError(f"不支援的資料來源: {source}")
 
 
+def _range_closed(symbol: str, start_date: str, end_date: str) -> bool:
+    """結束日期早於今天的區間資料不會再變動，才可以寫入磁碟快取"""
+    return end_date < datetime.now().strftime('%Y-%m-%d')
+
+
+def _fetch_limited(symbol: str, start_date: str, end_date: str, source: str) -> pd.DataFrame:
+    """在請求數上限內抓取單一股票"""
+    with _request_slots:
+        return fetch_stock_data(symbol, start_date, end_date, source)
+
+
+def fetch_many(symbols: List[str], start_date: str = None, end_date: str = None,
+               source: str = 'finmind', max_workers: int = 8) -> Dict[str, pd.DataFrame]:
+    """
+    以執行緒池同時抓取多支股票 (網路 I/O 期間不佔用 GIL)
+
+    Args:
+        symbols: 股票代碼列表
+        start_date: 開始日期 (格式: 'YYYY-MM-DD')
+        end_date: 結束日期 (格式: 'YYYY-MM-DD')
+        source: 資料來源 ('finmind' 或 'yfinance')
+        max_workers: 執行緒數 (實際同時請求數另受 MAX_CONCURRENT_REQUESTS 限制)
+
+    Returns:
+        {股票代碼: DataFrame}，依 symbols 順序排列；抓取失敗的股票為 None
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(_fetch_limited, symbol, start_date, end_date, source): symbol
+                   for symbol in symbols}
+
+        results = {}
+        for future in as_completed(futures):
+            symbol = futures[future]
+            try:
+                results[symbol] = future.result()
+            except Exception as e:
+                # 單一股票失敗不影響其他股票
+                print(f"抓取 {symbol} 資料失敗: {str(e)}")
+                results[symbol] = None
+
+    return {symbol: results[symbol] for symbol in symbols}
+
+
+@disk_cache(cache_dir='.cache/fetch', ttl=86400, cacheable=_range_closed)
 def fetch_from_finmind(symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
     """
     從 FinMind API 抓取資料
@@ -49,9 +133,7 @@ def fetch_from_finmind(symbol: str, start_date: str, end_date: str) -> pd.DataFr
         DataFrame 包含 open, high, low, close, volume 欄位
     """
     try:
-        from FinMind.data import DataLoader
-
-        dl = DataLoader()
+        dl = _get_finmind_loader()
 
         # 抓取台股資料
         df = dl.taiwan_stock_daily(
@@ -91,6 +173,7 @@ def fetch_from_finmind(symbol: str, start_date: str, end_date: str) -> pd.DataFr
         return None
 
 
+@disk_cache(cache_dir='.cache/fetch', ttl=86400, cacheable=_range_closed)
 def fetch_from_yfinance(symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
     """
     從 yfinance API 抓取資料
@@ -104,7 +187,7 @@ def fetch_from_yfinance(symbol: str, start_date: str, end_date: str) -> pd.DataF
         DataFrame 包含 open, high, low, close, volume 欄位
     """
     try:
-        import yfinance as yf
+        yf = _get_yfinance()
 
         # 台股需要加上 .TW 後綴
         if not symbol.endswith('.TW') and not symbol.endswith('.TWO'):
@@ -135,9 +218,14 @@ def fetch_from_yfinance(symbol: str, start_date: str, end_date: str) -> pd.DataF
         return None
 
 
+def _stock_file(symbol: str, data_type: str, ext: str) -> str:
+    """股票資料檔路徑"""
+    return f'data/{data_type}/{symbol}_{data_type}.{ext}'
+
+
 def save_stock_data(symbol: str, df: pd.DataFrame, data_type: str = 'raw'):
     """
-    儲存股票資料到 CSV
+    儲存股票資料 (優先使用 Parquet，未安裝 pyarrow 時使用 CSV)
 
     Args:
         symbol: 股票代碼
@@ -149,15 +237,19 @@ def save_stock_data(symbol: str, df: pd.DataFrame, data_type: str = 'raw'):
     os.makedirs(data_dir, exist_ok=True)
 
     # 儲存檔案
-    filename = f'{data_dir}/{symbol}_{data_type}.csv'
-    df.to_csv(filename)
+    if PARQUET_AVAILABLE:
+        filename = _stock_file(symbol, data_type, 'parquet')
+        df.to_parquet(filename, engine='pyarrow', compression='snappy')
+    else:
+        filename = _stock_file(symbol, data_type, 'csv')
+        df.to_csv(filename)
 
     print(f"資料已儲存至: {filename}")
 
 
 def load_stock_data(symbol: str, data_type: str = 'raw') -> pd.DataFrame:
     """
-    從 CSV 載入股票資料
+    載入股票資料 (先找 Parquet，再找舊的 CSV)
 
     Args:
         symbol: 股票代碼
@@ -166,14 +258,27 @@ def load_stock_data(symbol: str, data_type: str = 'raw') -> pd.DataFrame:
     Returns:
         DataFrame
     """
-    filename = f'data/{data_type}/{symbol}_{data_type}.csv'
+    filename = _stock_file(symbol, data_type, 'csv')
+    parquet_file = _stock_file(symbol, data_type, 'parquet')
+    if PARQUET_AVAILABLE and os.path.exists(parquet_file):
+        filename = parquet_file
 
     if not os.path.exists(filename):
         print(f"檔案不存在: {filename}")
         return None
 
-    df = pd.read_csv(filename, index_col=0, parse_dates=True)
-    return df
+    # 以修改時間作為快取鍵的一部分，檔案被重新寫入後自動失效；
+    # 回傳副本避免呼叫端修改到快取中的資料
+    df = _read_stock_file(filename, os.stat(filename).st_mtime_ns)
+    return df.copy()
+
+
+@lru_cache(maxsize=128)
+def _read_stock_file(filename: str, mtime_ns: int) -> pd.DataFrame:
+    """讀取股票資料檔 (依檔名與修改時間快取)"""
+    if filename.endswith('.parquet'):
+        return pd.read_parquet(filename, engine='pyarrow')
+    return pd.read_csv(filename, index_col=0, parse_dates=True)
 
 
 def update_stock_data(symbol: str, source: str = 'finmind') -> pd.DataFrame:
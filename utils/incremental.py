@@ -0,0 +1,139 @@
+"""
+增量指標更新
+盤中或每日新增少量資料時，只以上一筆的狀態推算下一個指標值，不必重算整段歷史
+"""
+from collections import deque, namedtuple
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from ._njit import njit
+
+
+# RSI 狀態：Wilder 平均漲跌幅、上一筆收盤價與週期
+RsiState = namedtuple('RsiState', ['avg_gain', 'avg_loss', 'prev_close', 'period'])
+
+# SMA 狀態：最近 window 筆價格 (deque)、其總和與窗口大小
+SmaState = namedtuple('SmaState', ['buffer', 'running_sum', 'window'])
+
+
+@njit('UniTuple(f8, 2)(f8[:], i8)', cache=True, nogil=True)
+def _wilder_averages(prices, period):
+    """走訪歷史價格，回傳最後一筆的 Wilder 平均漲跌幅 (與 calculate_rsi 相同遞迴)"""
+    sum_gain = 0.0
+    sum_loss = 0.0
+    for i in range(1, period + 1):
+        delta = prices[i] - prices[i - 1]
+        if delta > 0:
+            sum_gain += delta
+        elif delta < 0:
+            sum_loss -= delta
+    avg_gain = sum_gain / period
+    avg_loss = sum_loss / period
+
+    for i in range(period + 1, len(prices)):
+        delta = prices[i] - prices[i - 1]
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        avg_gain = (avg_gain * (period - 1) + gain) / period
+        avg_loss = (avg_loss * (period - 1) + loss) / period
+
+    return avg_gain, avg_loss
+
+
+def _rsi_value(avg_gain: float, avg_loss: float) -> float:
+    """由平均漲跌幅計算 RSI (與 calculate_rsi 的邊界處理一致)"""
+    if avg_loss == 0:
+        return 100.0 if avg_gain > 0 else np.nan
+    return 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+
+def init_rsi_state(prices: pd.Series, period: int = 14) -> RsiState:
+    """
+    以歷史價格建立 RSI 狀態
+
+    Args:
+        prices: 歷史價格序列 (至少 period + 1 筆)
+        period: RSI 週期 (預設 14)
+
+    Returns:
+        RsiState，之後以 update_rsi 逐筆更新
+    """
+    values = prices.to_numpy(dtype=np.float64)
+    if len(values) <= period:
+        raise ValueError(f"計算 RSI 狀態至少需要 {period + 1} 筆價格")
+
+    avg_gain, avg_loss = _wilder_averages(values, int(period))
+
+    return RsiState(avg_gain, avg_loss, float(values[-1]), int(period))
+
+
+def update_rsi(state: RsiState, new_price: float) -> Tuple[float, RsiState]:
+    """
+    加入一筆新價格並以 Wilder 遞迴推算下一個 RSI，O(1)
+
+    Args:
+        state: 目前的 RSI 狀態
+        new_price: 新的收盤價
+
+    Returns:
+        (RSI, 新的狀態)
+    """
+    period = state.period
+    delta = new_price - state.prev_close
+    gain = delta if delta > 0 else 0.0
+    loss = -delta if delta < 0 else 0.0
+
+    avg_gain = (state.avg_gain * (period - 1) + gain) / period
+    avg_loss = (state.avg_loss * (period - 1) + loss) / period
+
+    new_state = RsiState(avg_gain, avg_loss, float(new_price), period)
+
+    return _rsi_value(avg_gain, avg_loss), new_state
+
+
+def init_sma_state(prices: pd.Series, window: int) -> SmaState:
+    """
+    以歷史價格建立 SMA 狀態
+
+    Args:
+        prices: 歷史價格序列 (只會用到最後 window 筆)
+        window: 移動平均窗口
+
+    Returns:
+        SmaState，之後以 update_sma 逐筆更新
+    """
+    buffer = deque((float(x) for x in prices.to_numpy(dtype=np.float64)[-window:]),
+                   maxlen=window)
+
+    return SmaState(buffer, sum(buffer), int(window))
+
+
+def update_sma(state: SmaState, new_price: float) -> Tuple[float, SmaState]:
+    """
+    加入一筆新價格並推算下一個 SMA
+
+    總和以加減首尾價格更新；buffer 會複製一份 (O(window))，舊的狀態仍可重複使用
+
+    Args:
+        state: 目前的 SMA 狀態
+        new_price: 新的收盤價
+
+    Returns:
+        (SMA，資料不足 window 筆時為 NaN, 新的狀態)
+    """
+    buffer = deque(state.buffer, maxlen=state.window)
+    running_sum = state.running_sum
+
+    if len(buffer) == state.window:
+        running_sum -= buffer[0]
+    buffer.append(float(new_price))
+    running_sum += new_price
+
+    new_state = SmaState(buffer, running_sum, state.window)
+
+    if len(buffer) < state.window:
+        return np.nan, new_state
+
+    return running_sum / state.window, new_state
@@ -0,0 +1,101 @@
+"""
+技術指標快取
+參數掃描時同一份價格資料會以相同參數重複計算指標，以 LRU 快取重用計算結果
+"""
+from collections import OrderedDict
+from functools import wraps
+from typing import Dict
+import numpy as np
+import pandas as pd
+
+from .indicators import (calculate_sma, calculate_rsi, calculate_atr,
+                         calculate_rsi_soa, calculate_atr_soa,
+                         _prefix_sums, _sma_from_prefix)
+
+
+_CACHE_MAXSIZE = 256
+_cache = OrderedDict()
+
+
+def _arg_key(value):
+    """
+    將參數轉為可雜湊的快取鍵
+
+    Series / ndarray 無法直接雜湊，改以 dtype、長度與內容雜湊識別；
+    Series 另外納入索引，避免不同日期範圍但數值相同的資料誤用快取。
+    """
+    if isinstance(value, pd.Series):
+        return (_arg_key(value.to_numpy()), _arg_key(value.index.to_numpy()))
+    if isinstance(value, np.ndarray):
+        return (value.dtype.str, value.shape, hash(value.tobytes()))
+    return value
+
+
+def memoize_indicator(func):
+    """
+    指標函式的 LRU 快取裝飾器
+
+    Args:
+        func: 指標計算函式 (輸入為 Series / ndarray 與純量參數)
+
+    Returns:
+        帶快取的函式，回傳值與原函式相同 (請勿就地修改)
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        key = (func.__name__,
+               tuple(_arg_key(arg) for arg in args),
+               tuple(sorted((name, _arg_key(arg)) for name, arg in kwargs.items())))
+
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+        result = func(*args, **kwargs)
+
+        _cache[key] = result
+        if len(_cache) > _CACHE_MAXSIZE:
+            _cache.popitem(last=False)
+
+        return result
+
+    return wrapper
+
+
+def clear_indicator_cache():
+    """清除所有指標快取"""
+    _cache.clear()
+
+
+@memoize_indicator
+def _cached_prefix_sums(prices: pd.Series):
+    """價格序列的前綴和 (依序列內容快取，與窗口無關)"""
+    return _prefix_sums(prices.to_numpy(dtype=np.float64, copy=False))
+
+
+def cached_smas(prices: pd.Series, windows) -> Dict[int, pd.Series]:
+    """
+    calculate_smas 的快取版本
+
+    快取的是整條價格序列的前綴和而非 (窗口組合 -> 結果)，因此網格中每組
+    (短窗口, 長窗口) 都不同時，各窗口仍只需一次切片相減。
+
+    Args:
+        prices: 價格序列
+        windows: 移動平均窗口列表
+
+    Returns:
+        {窗口: SMA 序列}
+    """
+    cs, nan_cs = _cached_prefix_sums(prices)
+
+    return {window: pd.Series(_sma_from_prefix(cs, nan_cs, window),
+                              index=prices.index, name=prices.name)
+            for window in windows}
+
+
+cached_sma = memoize_indicator(calculate_sma)
+cached_rsi = memoize_indicator(calculate_rsi)
+cached_atr = memoize_indicator(calculate_atr)
+cached_rsi_soa = memoize_indicator(calculate_rsi_soa)
+cached_atr_soa = memoize_indicator(calculate_atr_soa)
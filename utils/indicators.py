@@ -2,9 +2,39 @@
 技術指標計算工具
 包含 SMA, RSI, ATR 等常用指標
 """
+from typing import Dict
+
 import pandas as pd
 import numpy as np
 
+from ._njit import njit
+
+try:
+    import bottleneck as bn
+except ImportError:
+    bn = None
+
+
+def _prefix_sums(arr: np.ndarray):
+    """回傳 (數值前綴和, 缺值數前綴和)，缺值以 0 累加"""
+    nan_mask = np.isnan(arr)
+    cs = np.concatenate(([0.0], np.cumsum(np.where(nan_mask, 0.0, arr))))
+    nan_cs = np.concatenate(([0], np.cumsum(nan_mask)))
+    return cs, nan_cs
+
+
+def _sma_from_prefix(cs: np.ndarray, nan_cs: np.ndarray, window: int) -> np.ndarray:
+    """由前綴和取出單一窗口的 SMA：每個窗口的總和為 cs[i + window] - cs[i]"""
+    n = len(cs) - 1
+    out = np.full(n, np.nan)
+    if window > n:
+        return out
+
+    out[window - 1:] = (cs[window:] - cs[:-window]) / window
+    # 窗口內有缺值時與 rolling().mean() 相同回傳 NaN
+    out[window - 1:][(nan_cs[window:] - nan_cs[:-window]) > 0] = np.nan
+    return out
+
 
 def calculate_sma(prices: pd.Series, window: int) -> pd.Series:
     """
@@ -17,7 +47,70 @@ def calculate_sma(prices: pd.Series, window: int) -> pd.Series:
     Returns:
         SMA 序列
     """
-    return prices.rolling(window=window).mean()
+    arr = prices.to_numpy(dtype=np.float64, copy=False)
+
+    if bn is not None and window <= len(arr):
+        out = bn.move_mean(arr, window=window, min_count=window)
+    else:
+        out = _sma_from_prefix(*_prefix_sums(arr), window)
+
+    return pd.Series(out, index=prices.index, name=prices.name)
+
+
+def calculate_smas(prices: pd.Series, windows) -> Dict[int, pd.Series]:
+    """
+    一次計算多個窗口的簡單移動平均
+
+    只走訪價格一次建立前綴和，各窗口僅需一次切片相減，
+    適合同一價格序列需要多條均線的情境 (例如短期 / 長期均線)。
+
+    Args:
+        prices: 價格序列
+        windows: 移動平均窗口列表
+
+    Returns:
+        {窗口: SMA 序列}
+    """
+    arr = prices.to_numpy(dtype=np.float64, copy=False)
+    cs, nan_cs = _prefix_sums(arr)
+
+    return {window: pd.Series(_sma_from_prefix(cs, nan_cs, window),
+                              index=prices.index, name=prices.name)
+            for window in windows}
+
+
+@njit(['f8[:](f8[:], f8)', 'f4[:](f4[:], f8)'], cache=True, nogil=True)
+def _ewm_alpha(x, alpha):
+    """
+    指數加權移動平均 (等同 ewm(alpha=alpha, adjust=False).mean())
+
+    開頭的 NaN 保持 NaN，以第一個有效值為起始值；中間遇到 NaN 時輸出沿用前一個平均值，
+    但舊平均值的權重仍逐筆乘上 (1 - alpha)，缺值後第一筆有效值再重新正規化 (ignore_na=False)。
+    輸出與輸入同 dtype，內部以 float64 累加。
+    """
+    n = len(x)
+    out = np.empty_like(x)
+
+    i0 = 0
+    while i0 < n and np.isnan(x[i0]):
+        out[i0] = np.nan
+        i0 += 1
+    if i0 == n:
+        return out
+
+    prev = float(x[i0])
+    out[i0] = prev
+    old_wt = 1.0
+    for i in range(i0 + 1, n):
+        old_wt *= 1.0 - alpha
+        value = x[i]
+        if not np.isnan(value):
+            if prev != value:
+                prev = (old_wt * prev + alpha * value) / (old_wt + alpha)
+            old_wt = 1.0
+        out[i] = prev
+
+    return out
 
 
 def calculate_ema(prices: pd.Series, window: int) -> pd.Series:
@@ -31,12 +124,73 @@ def calculate_ema(prices: pd.Series, window: int) -> pd.Series:
     Returns:
         EMA 序列
     """
-    return prices.ewm(span=window, adjust=False).mean()
+    ema = _ewm_alpha(prices.to_numpy(dtype=np.float64), 2.0 / (window + 1))
+
+    return pd.Series(ema, index=prices.index, name=prices.name)
+
+
+@njit(['f8[:](f8[:], i8)', 'f4[:](f4[:], i8)'], cache=True, nogil=True)
+def _rsi_numba(prices, period):
+    """
+    以 Wilder 平滑法單次走訪計算 RSI
+
+    前 period 筆為 NaN；平均跌幅為 0 時 RSI 為 100 (漲跌皆為 0 時為 NaN)。
+    輸出與輸入同 dtype，內部累加一律使用 float64。
+    """
+    n = len(prices)
+    out = np.empty(n, dtype=prices.dtype)
+    out[:min(period, n)] = np.nan
+    if n <= period:
+        return out
+
+    # 前 period 個價格變化的平均漲跌幅作為起始值
+    sum_gain = 0.0
+    sum_loss = 0.0
+    for i in range(1, period + 1):
+        delta = float(prices[i]) - float(prices[i - 1])
+        if delta > 0:
+            sum_gain += delta
+        elif delta < 0:
+            sum_loss -= delta
+    avg_gain = sum_gain / period
+    avg_loss = sum_loss / period
+
+    for i in range(period, n):
+        if i > period:
+            delta = float(prices[i]) - float(prices[i - 1])
+            gain = delta if delta > 0 else 0.0
+            loss = -delta if delta < 0 else 0.0
+            avg_gain = (avg_gain * (period - 1) + gain) / period
+            avg_loss = (avg_loss * (period - 1) + loss) / period
+
+        if avg_loss == 0:
+            out[i] = 100.0 if avg_gain > 0 else np.nan
+        else:
+            out[i] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+    return out
+
+
+def calculate_rsi_soa(close: np.ndarray, period: int = 14) -> np.ndarray:
+    """
+    calculate_rsi 的陣列版本 (搭配 PriceArrays 使用)
+
+    Args:
+        close: 收盤價陣列 (float32 或 float64)
+        period: RSI 週期 (預設 14)
+
+    Returns:
+        與輸入同 dtype 的 RSI 陣列
+    """
+    if close.dtype != np.float32:
+        close = close.astype(np.float64, copy=False)
+
+    return _rsi_numba(close, int(period))
 
 
 def calculate_rsi(prices: pd.Series, period: int = 14) -> pd.Series:
     """
-    計算相對強弱指標 (Relative Strength Index)
+    計算相對強弱指標 (Relative Strength Index)，平均漲跌幅採用 Wilder 平滑法
 
     Args:
         prices: 價格序列
@@ -45,22 +199,35 @@ def calculate_rsi(prices: pd.Series, period: int = 14) -> pd.Series:
     Returns:
         RSI 序列 (0-100)
     """
-    # 計算價格變化
-    delta = prices.diff()
+    rsi = calculate_rsi_soa(prices.to_numpy(dtype=np.float64, copy=False), period)
+
+    return pd.Series(rsi, index=prices.index)
 
-    # 分離上漲和下跌
-    gain = delta.where(delta > 0, 0)
-    loss = -delta.where(delta < 0, 0)
 
-    # 計算平均漲跌幅
-    avg_gain = gain.rolling(window=period).mean()
-    avg_loss = loss.rolling(window=period).mean()
+def calculate_atr_soa(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                      period: int = 14) -> np.ndarray:
+    """
+    calculate_atr 的陣列版本 (搭配 PriceArrays 使用)
+
+    Args:
+        high: 最高價陣列
+        low: 最低價陣列
+        close: 收盤價陣列
+        period: ATR 週期 (預設 14)
+
+    Returns:
+        與 close 同 dtype 的 ATR 陣列
+    """
+    # 前一日收盤價
+    prev_close = np.empty_like(close)
+    prev_close[:1] = np.nan
+    prev_close[1:] = close[:-1]
 
-    # 計算 RS 和 RSI
-    rs = avg_gain / avg_loss
-    rsi = 100 - (100 / (1 + rs))
+    # 計算 True Range (fmax 會忽略 NaN，第一筆即為 high - low)
+    tr = np.fmax(np.fmax(high - low, np.abs(high - prev_close)), np.abs(low - prev_close))
 
-    return rsi
+    # 計算 ATR (Wilder 平滑，alpha = 1 / period)
+    return _ewm_alpha(tr, 1.0 / period)
 
 
 def calculate_atr(high: pd.Series, low: pd.Series, close: pd.Series, period: int = 14) -> pd.Series:
@@ -76,17 +243,12 @@ def calculate_atr(high: pd.Series, low: pd.Series, close: pd.Series, period: int
     Returns:
         ATR 序列
     """
-    # 計算 True Range
-    tr1 = high - low
-    tr2 = abs(high - close.shift())
-    tr3 = abs(low - close.shift())
-
-    tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-
-    # 計算 ATR (使用 EMA)
-    atr = tr.ewm(span=period, adjust=False).mean()
+    atr = calculate_atr_soa(high.to_numpy(dtype=np.float64),
+                            low.to_numpy(dtype=np.float64),
+                            close.to_numpy(dtype=np.float64),
+                            period)
 
-    return atr
+    return pd.Series(atr, index=close.index)
 
 
 def calculate_bollinger_bands(prices: pd.Series, window: int = 20, num_std: float = 2.0):
@@ -101,11 +263,22 @@ def calculate_bollinger_bands(prices: pd.Series, window: int = 20, num_std: floa
     Returns:
         (upper_band, middle_band, lower_band) 三條線
     """
-    middle_band = calculate_sma(prices, window)
-    std = prices.rolling(window=window).std()
+    arr = prices.to_numpy(dtype=np.float64, copy=False)
 
-    upper_band = middle_band + (std * num_std)
-    lower_band = middle_band - (std * num_std)
+    if bn is not None and window <= len(arr):
+        # 平均與標準差各以一次滑動累加求出 (標準差維持樣本標準差 ddof=1)
+        middle = bn.move_mean(arr, window=window, min_count=window)
+        std = bn.move_std(arr, window=window, min_count=window, ddof=1)
+    else:
+        middle = calculate_sma(prices, window).to_numpy()
+        std = prices.rolling(window=window).std().to_numpy()
+
+    band = std * num_std
+    index = prices.index
+
+    upper_band = pd.Series(middle + band, index=index, name=prices.name)
+    middle_band = pd.Series(middle, index=index, name=prices.name)
+    lower_band = pd.Series(middle - band, index=index, name=prices.name)
 
     return upper_band, middle_band, lower_band
 
@@ -133,6 +306,42 @@ def calculate_macd(prices: pd.Series, fast: int = 12, slow: int = 26, signal: in
     return macd_line, signal_line, histogram
 
 
+def calculate_stochastic_soa(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                             k_period: int = 14, d_period: int = 3):
+    """
+    calculate_stochastic 的陣列版本 (搭配 PriceArrays 使用)
+
+    Args:
+        high: 最高價陣列
+        low: 最低價陣列
+        close: 收盤價陣列
+        k_period: K 線週期 (預設 14)
+        d_period: D 線週期 (預設 3)
+
+    Returns:
+        (k_line, d_line) 陣列
+    """
+    n = len(close)
+
+    if bn is not None and k_period <= n:
+        lowest_low = bn.move_min(low, window=k_period, min_count=k_period)
+        highest_high = bn.move_max(high, window=k_period, min_count=k_period)
+    else:
+        lowest_low = pd.Series(low).rolling(window=k_period).min().to_numpy()
+        highest_high = pd.Series(high).rolling(window=k_period).max().to_numpy()
+
+    # 區間最高等於最低時與 pandas 相同產生 inf / NaN，不發出警告
+    with np.errstate(divide='ignore', invalid='ignore'):
+        k_line = 100 * (close - lowest_low) / (highest_high - lowest_low)
+
+    if bn is not None and d_period <= n:
+        d_line = bn.move_mean(k_line, window=d_period, min_count=d_period)
+    else:
+        d_line = _sma_from_prefix(*_prefix_sums(k_line), d_period)
+
+    return k_line, d_line
+
+
 def calculate_stochastic(high: pd.Series, low: pd.Series, close: pd.Series,
                          k_period: int = 14, d_period: int = 3):
     """
@@ -148,13 +357,12 @@ def calculate_stochastic(high: pd.Series, low: pd.Series, close: pd.Series,
     Returns:
         (k_line, d_line)
     """
-    lowest_low = low.rolling(window=k_period).min()
-    highest_high = high.rolling(window=k_period).max()
+    k_line, d_line = calculate_stochastic_soa(high.to_numpy(dtype=np.float64),
+                                              low.to_numpy(dtype=np.float64),
+                                              close.to_numpy(dtype=np.float64),
+                                              k_period, d_period)
 
-    k_line = 100 * (close - lowest_low) / (highest_high - lowest_low)
-    d_line = k_line.rolling(window=d_period).mean()
-
-    return k_line, d_line
+    return pd.Series(k_line, index=close.index), pd.Series(d_line, index=close.index)
 
 
 def calculate_obv(close: pd.Series, volume: pd.Series) -> pd.Series:
@@ -168,5 +376,16 @@ def calculate_obv(close: pd.Series, volume: pd.Series) -> pd.Series:
     Returns:
         OBV 序列
     """
-    obv = (np.sign(close.diff()) * volume).fillna(0).cumsum()
-    return obv
+    c = close.to_numpy(dtype=np.float64)
+    v = volume.to_numpy(dtype=np.float64)
+
+    # 價格變化 (第一筆視為 0)
+    diff = np.empty_like(c)
+    diff[:1] = 0.0
+    np.subtract(c[1:], c[:-1], out=diff[1:])
+
+    # 上漲加量、下跌減量，持平或缺值不變
+    signed = np.where(diff > 0, v, np.where(diff < 0, -v, 0.0))
+    signed[np.isnan(signed)] = 0.0
+
+    return pd.Series(signed.cumsum(), index=close.index)
@@ -0,0 +1,36 @@
+"""
+JSON 輸出工具
+優先使用 orjson (C 實作，直接輸出 bytes)，未安裝時退回標準函式庫 json
+"""
+import json
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _json_default(obj):
+    """讓標準函式庫 json 也能序列化 NumPy 純量與陣列"""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"無法序列化的型別: {type(obj).__name__}")
+
+
+def dump_json(obj, filename: str):
+    """
+    將物件以縮排 2 格的 UTF-8 JSON 寫入檔案
+
+    Args:
+        obj: 要輸出的物件 (可包含 NumPy 純量與陣列)
+        filename: 輸出檔案名稱
+    """
+    if orjson is not None:
+        with open(filename, 'wb') as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+    else:
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(obj, f, indent=2, ensure_ascii=False, default=_json_default)
@@ -1,13 +1,32 @@
 """
 繪圖工具
-用於視覺化股價、指標和回測結果
+用於視覺化股價、指標和回測結果 (matplotlib 在各函式內才匯入，只做回測時不需負擔其載入時間)
 """
-import matplotlib.pyplot as plt
 import pandas as pd
-import numpy as np
 
+from .plot_downsample import lttb_indices
 
-def plot_price_with_indicators(df: pd.DataFrame, indicators: list = None, title: str = None):
+
+def _downsample(series: pd.Series, n_target: int):
+    """
+    有效點數超過 n_target 時去除缺值並以 LTTB 降採樣，回傳可直接給 ax.plot 的 (x, y)
+
+    未降採樣時保留缺值，線條在缺口處照常斷開；日期索引以整數時間計算面積 (支援時區)
+    """
+    valid = series.notna().to_numpy()
+    if n_target < 3 or valid.sum() <= n_target:
+        return series.index, series.to_numpy()
+
+    index = series.index[valid]
+    y = series.to_numpy()[valid]
+    x = index.asi8 if isinstance(index, pd.DatetimeIndex) else index.to_numpy()
+    selected = lttb_indices(x, y, n_target)
+
+    return index[selected], y[selected]
+
+
+def plot_price_with_indicators(df: pd.DataFrame, indicators: list = None, title: str = None,
+                               n_target: int = 5000):
     """
     繪製股價與技術指標
 
@@ -15,21 +34,24 @@ def plot_price_with_indicators(df: pd.DataFrame, indicators: list = None, title:
         df: 包含股價和指標的 DataFrame
         indicators: 要繪製的指標欄位名稱列表
         title: 圖表標題
+        n_target: 每條線最多繪製的點數，超過時以 LTTB 降採樣
     """
+    import matplotlib.pyplot as plt
+
     if indicators is None:
         indicators = []
 
     fig, ax = plt.subplots(figsize=(14, 7))
 
     # 繪製收盤價
-    ax.plot(df.index, df['close'], label='收盤價', linewidth=2, color='black')
+    ax.plot(*_downsample(df['close'], n_target), label='收盤價', linewidth=2, color='black')
 
     # 繪製指標
     colors = ['blue', 'red', 'green', 'orange', 'purple']
     for i, indicator in enumerate(indicators):
         if indicator in df.columns:
             color = colors[i % len(colors)]
-            ax.plot(df.index, df[indicator], label=indicator, linewidth=1.5,
+            ax.plot(*_downsample(df[indicator], n_target), label=indicator, linewidth=1.5,
                    linestyle='--', color=color, alpha=0.7)
 
     ax.set_xlabel('日期', fontsize=12)
@@ -42,27 +64,35 @@ def plot_price_with_indicators(df: pd.DataFrame, indicators: list = None, title:
     plt.show()
 
 
-def plot_backtest_results(df: pd.DataFrame, title: str = None):
+def plot_backtest_results(df: pd.DataFrame, title: str = None, n_target: int = 5000):
     """
     繪製回測結果
 
     Args:
         df: 回測結果 DataFrame (包含 total, signal 等欄位)
         title: 圖表標題
+        n_target: 價格與資產曲線最多繪製的點數，超過時以 LTTB 降採樣 (買賣點不降採樣)
     """
+    import matplotlib.pyplot as plt
+
     fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 10), sharex=True)
 
     # 上圖: 股價與買賣點
-    ax1.plot(df.index, df['close'], label='收盤價', linewidth=2, color='black')
+    ax1.plot(*_downsample(df['close'], n_target), label='收盤價', linewidth=2, color='black')
+
+    # 直接以遮罩取出買賣點的日期與價格，不建立篩選後的 DataFrame
+    signal = df['signal'].to_numpy()
+    dates = df.index.to_numpy()
+    close = df['close'].to_numpy()
 
     # 標記買入點
-    buy_signals = df[df['signal'] > 0]
-    ax1.scatter(buy_signals.index, buy_signals['close'], marker='^',
+    buy_mask = signal > 0
+    ax1.scatter(dates[buy_mask], close[buy_mask], marker='^',
                color='green', s=100, label='買入', zorder=5)
 
     # 標記賣出點
-    sell_signals = df[df['signal'] < 0]
-    ax1.scatter(sell_signals.index, sell_signals['close'], marker='v',
+    sell_mask = signal < 0
+    ax1.scatter(dates[sell_mask], close[sell_mask], marker='v',
                color='red', s=100, label='賣出', zorder=5)
 
     ax1.set_ylabel('股價', fontsize=12)
@@ -72,9 +102,10 @@ def plot_backtest_results(df: pd.DataFrame, title: str = None):
 
     # 下圖: 投資組合價值
     if 'total' in df.columns:
-        ax2.plot(df.index, df['total'], label='投資組合價值',
+        total_x, total_y = _downsample(df['total'], n_target)
+        ax2.plot(total_x, total_y, label='投資組合價值',
                 linewidth=2, color='blue')
-        ax2.fill_between(df.index, df['total'], alpha=0.3)
+        ax2.fill_between(total_x, total_y, alpha=0.3)
 
     ax2.set_xlabel('日期', fontsize=12)
     ax2.set_ylabel('投資組合價值', fontsize=12)
@@ -93,6 +124,8 @@ def plot_rsi(df: pd.DataFrame, title: str = None):
         df: 包含 RSI 欄位的 DataFrame
         title: 圖表標題
     """
+    import matplotlib.pyplot as plt
+
     fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 8), sharex=True)
 
     # 上圖: 股價
@@ -126,6 +159,8 @@ def plot_returns_distribution(returns: pd.Series, title: str = None):
         returns: 報酬率序列
         title: 圖表標題
     """
+    import matplotlib.pyplot as plt
+
     fig, ax = plt.subplots(figsize=(10, 6))
 
     # 繪製直方圖
@@ -154,6 +189,8 @@ def plot_drawdown(portfolio_value: pd.Series, title: str = None):
         portfolio_value: 投資組合價值序列
         title: 圖表標題
     """
+    import matplotlib.pyplot as plt
+
     # 計算回撤
     cummax = portfolio_value.cummax()
     drawdown = (portfolio_value - cummax) / cummax * 100
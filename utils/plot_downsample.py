@@ -0,0 +1,79 @@
+"""
+繪圖降採樣
+以 LTTB (Largest-Triangle-Three-Buckets) 保留走勢外觀，減少 matplotlib 需要繪製的點數
+"""
+from typing import Tuple
+
+import numpy as np
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_target: int) -> np.ndarray:
+    """
+    LTTB 降採樣，回傳保留點的位置
+
+    將資料依序切成 n_target - 2 個區間，每個區間保留與「前一個保留點」及
+    「下一個區間平均點」構成最大三角形面積的點；首尾兩點一定保留。
+
+    Args:
+        x: X 座標 (數值或 datetime64，需遞增)
+        y: Y 座標 (不可含 NaN)
+        n_target: 目標點數
+
+    Returns:
+        遞增的位置陣列；點數不超過 n_target 時為全部位置
+    """
+    n = len(x)
+    if n_target >= n or n_target < 3:
+        return np.arange(n)
+
+    # datetime64 以整數時間計算面積
+    if np.issubdtype(x.dtype, np.datetime64):
+        xf = x.astype('datetime64[ns]').astype(np.int64).astype(np.float64)
+    else:
+        xf = x.astype(np.float64)
+    yf = y.astype(np.float64)
+
+    every = (n - 2) / (n_target - 2)
+    selected = np.empty(n_target, dtype=np.int64)
+    selected[0] = 0
+    a = 0
+
+    for i in range(n_target - 2):
+        # 下一個區間的平均點
+        avg_start = int(np.floor((i + 1) * every)) + 1
+        avg_end = min(int(np.floor((i + 2) * every)) + 1, n)
+        avg_x = xf[avg_start:avg_end].mean()
+        avg_y = yf[avg_start:avg_end].mean()
+
+        # 目前區間內與 a 點、平均點構成最大三角形的點
+        start = int(np.floor(i * every)) + 1
+        end = int(np.floor((i + 1) * every)) + 1
+        area = np.abs((xf[a] - avg_x) * (yf[start:end] - yf[a])
+                      - (xf[a] - xf[start:end]) * (avg_y - yf[a]))
+
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+
+    selected[-1] = n - 1
+
+    return selected
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_target: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    LTTB 降採樣
+
+    Args:
+        x: X 座標 (數值或 datetime64，需遞增)
+        y: Y 座標 (不可含 NaN)
+        n_target: 目標點數
+
+    Returns:
+        (降採樣後的 x, 降採樣後的 y)；點數不超過 n_target 時原樣回傳
+    """
+    if n_target >= len(x) or n_target < 3:
+        return x, y
+
+    selected = lttb_indices(x, y, n_target)
+
+    return x[selected], y[selected]